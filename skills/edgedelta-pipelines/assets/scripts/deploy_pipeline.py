@@ -17,11 +17,33 @@ Environment options: Linux (default), Windows, Kubernetes
 
 import sys
 import json
+import time
 import requests
 import yaml
-import time
 from datetime import datetime
 from pathlib import Path
+from urllib3.util.retry import Retry
+
+# Prefer the libyaml-backed C loader when available (5-20x faster parse)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Optional HTTP/2 support: with httpx (and its h2 extra) installed, every
+# API call multiplexes over one TLS connection instead of HTTP/1.1 pooling.
+# h2 is checked here explicitly because httpx only raises for a missing
+# http2 extra lazily, on the first request.
+try:
+    import httpx
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+if httpx is not None:
+    _CLIENT_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+else:
+    _CLIENT_ERRORS = (requests.exceptions.RequestException,)
 
 API_BASE = "https://api.edgedelta.com/v1"
 
@@ -31,13 +53,34 @@ RETRY_DELAY_SECONDS = 2  # Exponential backoff: 2, 4, 8 seconds
 
 def print_error(message: str):
     """Print a prominent error message"""
-    print(f"\n{'!'*80}")
-    print(f"ERROR: {message}")
-    print(f"{'!'*80}\n")
-
-def is_retryable_error(status_code: int) -> bool:
-    """Check if the HTTP error is retryable (server-side errors)"""
-    return status_code >= 500 and status_code < 600
+    sys.stdout.write(f"\n{'!'*80}\nERROR: {message}\n{'!'*80}\n\n")
+
+def flush_status(lines: list):
+    """Emit buffered status lines with a single write"""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        lines.clear()
+
+def _read_tag_fast(content: str, max_lines: int = 200):
+    """Read settings.tag by parsing only the head of the pipeline YAML.
+
+    The tag lives in the top-level settings block, which sits in the first
+    few lines of every pipeline file — no need to tokenize thousands of
+    node definitions just to read it. Returns None if the prefix doesn't
+    parse or doesn't contain the tag, so callers can fall back to a full parse.
+    """
+    try:
+        prefix = "\n".join(content.split("\n", max_lines)[:max_lines])
+        config = yaml.load(prefix, Loader=_YamlLoader)
+        if isinstance(config, dict):
+            # The truncation point may land inside the settings block, in
+            # which case it parses as something other than a dict
+            settings = config.get("settings")
+            if isinstance(settings, dict):
+                return settings.get("tag")
+    except yaml.YAMLError:
+        pass
+    return None
 
 class PipelineDeployer:
     def __init__(self, org_id: str, api_token: str):
@@ -48,50 +91,80 @@ class PipelineDeployer:
             "accept": "application/json",
             "Content-Type": "application/json"
         }
+        self.session = self._build_client()
+
+    def _build_client(self):
+        """Build the shared HTTP client: httpx with HTTP/2 when installed, else requests"""
+        if httpx is not None:
+            # Connect-level retries live on the transport; 5xx retries are
+            # mirrored in _request_with_retry since httpx has no equivalent
+            # of urllib3's status_forcelist
+            return httpx.Client(
+                headers=self.headers,
+                timeout=60.0,
+                transport=httpx.HTTPTransport(
+                    http2=True,
+                    retries=MAX_RETRIES,
+                    limits=httpx.Limits(max_keepalive_connections=4)
+                )
+            )
+
+        # Reuse one HTTPS connection across the deploy steps instead of
+        # paying a fresh TCP+TLS handshake per API call. Retries on
+        # transient 5xx errors live on the adapter, which backs off
+        # exponentially and honors Retry-After hints from the server.
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_DELAY_SECONDS,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=retry)
+        session.mount("https://", adapter)
+        return session
+
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _request_with_retry(self, method: str, url: str, **kwargs):
+        """Make HTTP request; transient 5xx retries are handled by the session adapter"""
+        if method.upper() not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
-    def _request_with_retry(self, method: str, url: str, **kwargs) -> requests.Response:
-        """Make HTTP request with retry logic for transient errors"""
-        last_error = None
+        # The requests adapter retries transient 5xx itself; give the httpx
+        # client the same status-code policy with exponential backoff here
+        status_retries = MAX_RETRIES if httpx is not None and isinstance(self.session, httpx.Client) else 0
 
-        for attempt in range(1, MAX_RETRIES + 1):
+        attempt = 0
+        while True:
             try:
-                if method.upper() == "GET":
-                    response = requests.get(url, headers=self.headers, **kwargs)
-                elif method.upper() == "POST":
-                    response = requests.post(url, headers=self.headers, **kwargs)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-
-                # If successful or non-retryable error, return immediately
-                if response.status_code < 500:
-                    return response
-
-                # Server error - log and potentially retry
-                last_error = f"HTTP {response.status_code}: {response.text}"
-
-                if attempt < MAX_RETRIES:
-                    delay = RETRY_DELAY_SECONDS * (2 ** (attempt - 1))  # Exponential backoff
-                    print(f"⚠ Server error (attempt {attempt}/{MAX_RETRIES}): {response.status_code}")
-                    print(f"  Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                else:
-                    print_error(f"Server error after {MAX_RETRIES} attempts: {response.status_code}")
-                    print(f"Response: {response.text}")
-                    return response
-
-            except requests.exceptions.RequestException as e:
-                last_error = str(e)
-                if attempt < MAX_RETRIES:
-                    delay = RETRY_DELAY_SECONDS * (2 ** (attempt - 1))
-                    print(f"⚠ Request failed (attempt {attempt}/{MAX_RETRIES}): {e}")
-                    print(f"  Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                else:
-                    print_error(f"Request failed after {MAX_RETRIES} attempts: {e}")
-                    raise
-
-        # Should not reach here, but just in case
-        raise Exception(f"Request failed: {last_error}")
+                response = self.session.request(method.upper(), url, **kwargs)
+            except _CLIENT_ERRORS as e:
+                print_error(f"Request failed after {MAX_RETRIES} attempts: {e}")
+                raise
+
+            if response.status_code in (500, 502, 503, 504) and attempt < status_retries:
+                time.sleep(RETRY_DELAY_SECONDS * (2 ** attempt))
+                attempt += 1
+                continue
+            break
+
+        if response.status_code >= 500:
+            print_error(f"Server error after {MAX_RETRIES} attempts: {response.status_code}")
+            print(f"Response: {response.text}")
+
+        return response
 
     def create_pipeline(self, tag: str, environment: str = "Linux", description: str = ""):
         """Create a new base pipeline"""
@@ -123,31 +196,54 @@ class PipelineDeployer:
         print(f"✓ Pipeline created: {pipeline_id}")
         return pipeline_id
 
-    def deploy_config(self, pipeline_id: str, yaml_path: str, tag: str, environment: str = "Linux", description: str = ""):
-        """Deploy configuration to existing pipeline using 3-step process"""
+    def deploy_config(self, pipeline_id: str, yaml_path: str, tag: str, environment: str = "Linux", description: str = "", content: str = None):
+        """Deploy configuration to existing pipeline using 3-step process
 
-        # Read YAML content
-        try:
-            with open(yaml_path, 'r') as f:
-                content = f.read()
-        except Exception as e:
-            print_error(f"Failed to read YAML file: {e}")
-            return False
+        Accepts pre-read YAML via `content` so callers that already parsed
+        the file don't force a second read.
+        """
+        if content is None:
+            try:
+                with open(yaml_path, 'r') as f:
+                    content = f.read()
+            except Exception as e:
+                print_error(f"Failed to read YAML file: {e}")
+                return False
+
+        # Buffer per-step status chatter and emit it in single writes so a
+        # deploy costs a couple of stdout syscalls instead of a dozen
+        status = []
 
         # Step 1: Save configuration
         save_url = f"{API_BASE}/orgs/{self.org_id}/pipelines/{pipeline_id}/save"
 
-        # Properly encode YAML content in JSON payload
-        save_payload = {"content": content}
-
-        print(f"Step 1/3: Saving configuration to pipeline {pipeline_id}...")
+        status.append(f"Step 1/3: Saving configuration to pipeline {pipeline_id}...")
         try:
-            response = self._request_with_retry("POST", save_url, json=save_payload, timeout=60)
+            # Send the YAML as-is; wrapping it in JSON forces an escape pass
+            # over the whole document and inflates the payload on the wire
+            raw_body = content.encode("utf-8")
+            if httpx is not None and isinstance(self.session, httpx.Client):
+                body_kwargs = {"content": raw_body}
+            else:
+                body_kwargs = {"data": raw_body}
+            response = self._request_with_retry(
+                "POST", save_url,
+                headers={"Content-Type": "application/yaml"},
+                timeout=60, **body_kwargs
+            )
+            if 400 <= response.status_code < 500:
+                # API version without raw-YAML support — rejections come
+                # back as 415, but also as 400/422 from servers that try to
+                # parse the body as JSON. Nothing was saved, so retrying
+                # with the JSON-wrapped payload is safe.
+                response = self._request_with_retry("POST", save_url, json={"content": content}, timeout=60)
         except Exception as e:
+            flush_status(status)
             print_error(f"Failed to save config: {e}")
             return False
 
         if response.status_code not in [200, 201]:
+            flush_status(status)
             print_error(f"Failed to save config (HTTP {response.status_code})")
             print(f"Response: {response.text}")
             return False
@@ -156,57 +252,74 @@ class PipelineDeployer:
         error = result.get("error")
 
         if error and error != "null" and error is not None:
+            flush_status(status)
             print_error(f"Validation error: {error}")
             return False
 
-        print(f"✓ Configuration saved")
+        status.append("✓ Configuration saved")
 
-        # Step 2: Get version (timestamp) from history
-        history_url = f"{API_BASE}/orgs/{self.org_id}/pipelines/{pipeline_id}/history"
+        # Step 2: Get version (timestamp) — prefer the one returned by save
+        # itself, which spares a full HTTPS round-trip to /history. 'id'
+        # deliberately isn't a candidate: responses that echo the conf
+        # object carry the pipeline ID there, not a deployable version.
+        version = result.get("timestamp") or result.get("version")
+        if version:
+            version = str(version)
+            status.append(f"Step 2/3: Using version from save response: {version}")
+        else:
+            history_url = f"{API_BASE}/orgs/{self.org_id}/pipelines/{pipeline_id}/history"
 
-        print(f"Step 2/3: Getting version from history...")
-        try:
-            response = self._request_with_retry("GET", history_url)
-        except Exception as e:
-            print_error(f"Failed to get history: {e}")
-            return False
-
-        if response.status_code != 200:
-            print_error(f"Failed to get history (HTTP {response.status_code})")
-            print(f"Response: {response.text}")
-            return False
-
-        history = response.json()
-        if not history or len(history) == 0:
-            print_error("No history found for pipeline")
-            return False
-
-        # Get latest version (first item, highest timestamp)
-        # API returns 'timestamp' field, not 'lastUpdated'
-        version = str(history[0].get("timestamp"))
-        print(f"✓ Got version: {version}")
+            status.append(f"Step 2/3: Getting version from history...")
+            try:
+                response = self._request_with_retry("GET", history_url)
+            except Exception as e:
+                flush_status(status)
+                print_error(f"Failed to get history: {e}")
+                return False
+
+            if response.status_code != 200:
+                flush_status(status)
+                print_error(f"Failed to get history (HTTP {response.status_code})")
+                print(f"Response: {response.text}")
+                return False
+
+            history = response.json()
+            if not history or len(history) == 0:
+                flush_status(status)
+                print_error("No history found for pipeline")
+                return False
+
+            # Get latest version (first item, highest timestamp)
+            # API returns 'timestamp' field, not 'lastUpdated'
+            version = str(history[0].get("timestamp"))
+            status.append(f"✓ Got version: {version}")
 
         # Step 3: Deploy with version
         deploy_url = f"{API_BASE}/orgs/{self.org_id}/pipelines/{pipeline_id}/deploy/{version}"
 
-        print(f"Step 3/3: Deploying version {version}...")
+        status.append(f"Step 3/3: Deploying version {version}...")
         try:
             response = self._request_with_retry("POST", deploy_url)
         except Exception as e:
+            flush_status(status)
             print_error(f"Failed to deploy: {e}")
             return False
 
         if response.status_code not in [200, 201]:
+            flush_status(status)
             print_error(f"Failed to deploy (HTTP {response.status_code})")
             print(f"Response: {response.text}")
             return False
 
-        print(f"✓ Pipeline deployed successfully")
+        status.append("✓ Pipeline deployed successfully")
+        flush_status(status)
         return True
 
     def verify_pipeline(self, pipeline_id: str):
         """Verify pipeline exists and get details"""
-        url = f"{API_BASE}/orgs/{self.org_id}/confs"
+        # Fetch just this pipeline instead of listing every conf in the org;
+        # large orgs can return megabytes from the list endpoint
+        url = f"{API_BASE}/orgs/{self.org_id}/confs/{pipeline_id}"
 
         try:
             response = self._request_with_retry("GET", url, timeout=30)
@@ -214,29 +327,48 @@ class PipelineDeployer:
             print_error(f"Failed to verify pipeline: {e}")
             return False
 
-        if response.status_code != 200:
-            print_error(f"Failed to verify pipeline (HTTP {response.status_code})")
-            print(f"Response: {response.text}")
-            return False
+        pipeline = None
+        if response.status_code == 200:
+            pipeline = response.json()
+        else:
+            # Fall back to the org-wide listing for API versions without
+            # per-ID lookup
+            list_url = f"{API_BASE}/orgs/{self.org_id}/confs"
 
-        pipelines = response.json()
-
-        for p in pipelines:
-            if p.get("id") == pipeline_id:
-                print(f"\n{'='*80}")
-                print("PIPELINE DETAILS")
-                print(f"{'='*80}")
-                print(f"ID:          {p.get('id')}")
-                print(f"Tag:         {p.get('tag')}")
-                print(f"Description: {p.get('description')}")
-                print(f"Environment: {p.get('environment')}")
-                print(f"Created:     {p.get('created')}")
-                print(f"Updated:     {p.get('updated')}")
-                print(f"\nView at: https://app.edgedelta.com/pipelines/{pipeline_id}")
-                print(f"\nDeploy command:")
-                print(f"  ED_API_KEY={pipeline_id} bash -c \"$(curl -L https://release.edgedelta.com/release/install.sh)\"")
-                print(f"{'='*80}\n")
-                return True
+            try:
+                response = self._request_with_retry("GET", list_url, timeout=30)
+            except Exception as e:
+                print_error(f"Failed to verify pipeline: {e}")
+                return False
+
+            if response.status_code != 200:
+                print_error(f"Failed to verify pipeline (HTTP {response.status_code})")
+                print(f"Response: {response.text}")
+                return False
+
+            for p in response.json():
+                if p.get("id") == pipeline_id:
+                    pipeline = p
+                    break
+
+        if pipeline:
+            # Emit the details banner as one write instead of 14 prints
+            sys.stdout.write(
+                f"\n{'='*80}\n"
+                "PIPELINE DETAILS\n"
+                f"{'='*80}\n"
+                f"ID:          {pipeline.get('id')}\n"
+                f"Tag:         {pipeline.get('tag')}\n"
+                f"Description: {pipeline.get('description')}\n"
+                f"Environment: {pipeline.get('environment')}\n"
+                f"Created:     {pipeline.get('created')}\n"
+                f"Updated:     {pipeline.get('updated')}\n"
+                f"\nView at: https://app.edgedelta.com/pipelines/{pipeline_id}\n"
+                "\nDeploy command:\n"
+                f"  ED_API_KEY={pipeline_id} bash -c \"$(curl -L https://release.edgedelta.com/release/install.sh)\"\n"
+                f"{'='*80}\n\n"
+            )
+            return True
 
         print(f"✗ Pipeline {pipeline_id} not found in organization")
         return False
@@ -259,12 +391,14 @@ class PipelineDeployer:
 
     def full_deployment(self, yaml_path: str, environment: str = "Linux", description: str = ""):
         """Complete deployment: create + deploy + verify"""
-        # Read YAML to get tag from settings
+        # Read the file once; get the tag from a header-only parse with a
+        # full parse as fallback
         try:
-            with open(yaml_path, 'r') as f:
-                config = yaml.safe_load(f)
-
-            tag = config.get("settings", {}).get("tag", "deployed-pipeline")
+            raw = Path(yaml_path).read_text()
+            tag = _read_tag_fast(raw)
+            if tag is None:
+                config = yaml.load(raw, Loader=_YamlLoader)
+                tag = config.get("settings", {}).get("tag", "deployed-pipeline")
         except Exception as e:
             print(f"✗ Failed to read YAML: {e}")
             return None
@@ -282,7 +416,7 @@ class PipelineDeployer:
             return None
 
         # Step 2: Deploy config
-        if not self.deploy_config(pipeline_id, yaml_path, unique_tag, environment, description):
+        if not self.deploy_config(pipeline_id, yaml_path, unique_tag, environment, description, content=raw):
             print(f"✗ Deployment failed, but pipeline {pipeline_id} was created")
             return None
 
@@ -291,16 +425,26 @@ class PipelineDeployer:
 
         return pipeline_id
 
+_ORG_ID_KEYS = ('ED_ORG_ID', 'EDGEDELTA_ORG_ID')
+_API_TOKEN_KEYS = ('ED_API_TOKEN', 'ED_ORG_API_TOKEN', 'EDGEDELTA_API_TOKEN')
+
 def load_credentials_from_env(env_file: str):
     """Load credentials from .env file"""
+    # Only the credential keys matter — scan line by line, keep just those,
+    # and stop as soon as both credentials are found
+    needed = set(_ORG_ID_KEYS) | set(_API_TOKEN_KEYS)
     env_vars = {}
     try:
         with open(env_file, 'r') as f:
             for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip().strip('"').strip("'")
+                if '=' not in line or line.lstrip().startswith('#'):
+                    continue
+                key, _, value = line.partition('=')
+                key = key.strip()
+                if key in needed:
+                    env_vars[key] = value.strip().strip('"').strip("'")
+                    if (env_vars.keys() & set(_ORG_ID_KEYS)) and (env_vars.keys() & set(_API_TOKEN_KEYS)):
+                        break
 
         org_id = env_vars.get('ED_ORG_ID') or env_vars.get('EDGEDELTA_ORG_ID')
         api_token = env_vars.get('ED_API_TOKEN') or env_vars.get('ED_ORG_API_TOKEN') or env_vars.get('EDGEDELTA_API_TOKEN')
@@ -14,13 +14,41 @@ Detects:
 - Common applications (Docker, Nginx, databases, etc.)
 """
 
+import functools
+import os
+import shutil
+import socket
 import subprocess
 import sys
 import json
 import platform
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+@functools.lru_cache(maxsize=None)
+def binary_exists(name: str) -> bool:
+    """Check PATH for a binary without paying fork/exec for a missing one"""
+    return shutil.which(name) is not None
+
+def sample_log_files(directory: str, k: int = 3, cap: int = 10000) -> Tuple[int, List[str]]:
+    """Count .log files in a directory, keeping the first k names as a sample.
+
+    Uses scandir with an entry cap so a directory full of rotated logs
+    doesn't get fully materialized just to produce a count.
+    """
+    count = 0
+    samples = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(".log") and entry.is_file(follow_symlinks=False):
+                count += 1
+                if len(samples) < k:
+                    samples.append(entry.name)
+                if count >= cap:
+                    break
+    return count, samples
+
 class EnvironmentInspector:
     def __init__(self, verbose=False):
         self.verbose = verbose
@@ -34,19 +62,49 @@ class EnvironmentInspector:
             "metrics_endpoints": [],
             "suggestions": []
         }
+        # Inspections that can apply per platform — os_type is resolved once
+        # here so platform-dead branches are never dispatched at all
+        self._dispatch = {
+            "Linux": [
+                self.inspect_kubernetes,
+                self.inspect_linux_logs,
+                self.inspect_docker,
+                self.inspect_systemd_services,
+                self.inspect_common_apps,
+                self.inspect_metrics_endpoints
+            ],
+            "Darwin": [
+                self.inspect_kubernetes,
+                self.inspect_linux_logs,
+                self.inspect_docker,
+                self.inspect_common_apps,
+                self.inspect_metrics_endpoints
+            ],
+            "Windows": [
+                self.inspect_kubernetes,
+                self.inspect_docker,
+                self.inspect_common_apps,
+                self.inspect_metrics_endpoints
+            ]
+        }
 
     def log(self, msg):
         if self.verbose:
             print(f"[DEBUG] {msg}")
 
-    def run_command(self, cmd: List[str], check=False) -> Tuple[bool, str]:
-        """Run command and return success status and output"""
+    def run_command(self, cmd: List[str], check=False, timeout: int = 3) -> Tuple[bool, str]:
+        """Run command and return success status and output
+
+        The default timeout is short — local probes answer well under a
+        second, and a hung binary shouldn't stall the whole inspection.
+        Callers hitting remote endpoints pass a larger value.
+        """
         try:
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=timeout
             )
             if result.returncode == 0:
                 return True, result.stdout
@@ -60,6 +118,10 @@ class EnvironmentInspector:
         self.log("Checking for Kubernetes...")
 
         # Check if kubectl is available
+        if not binary_exists("kubectl"):
+            self.log("kubectl not available")
+            return
+
         success, _ = self.run_command(["kubectl", "version", "--client", "--short"])
         if not success:
             self.log("kubectl not available")
@@ -68,51 +130,34 @@ class EnvironmentInspector:
         self.findings["kubernetes"]["available"] = True
         self.log("✓ kubectl found")
 
-        # Get pods
-        success, output = self.run_command([
-            "kubectl", "get", "pods", "--all-namespaces",
-            "-o", "json"
-        ])
-        if success:
-            try:
-                pods_data = json.loads(output)
-                pod_count = len(pods_data.get("items", []))
-                self.findings["kubernetes"]["pods"] = pod_count
-                self.log(f"Found {pod_count} pods")
-
-                # Sample some pod names
-                pod_names = [p["metadata"]["name"] for p in pods_data.get("items", [])[:5]]
-                self.findings["kubernetes"]["sample_pods"] = pod_names
-            except (json.JSONDecodeError, KeyError, TypeError):
-                pass
-
-        # Get services
-        success, output = self.run_command([
-            "kubectl", "get", "services", "--all-namespaces",
-            "-o", "json"
-        ])
-        if success:
-            try:
-                svc_data = json.loads(output)
-                svc_count = len(svc_data.get("items", []))
-                self.findings["kubernetes"]["services"] = svc_count
-                self.log(f"Found {svc_count} services")
-            except (json.JSONDecodeError, KeyError, TypeError):
-                pass
+        # Pods, services, and deployments are independent queries — run them
+        # concurrently so inspection waits on the slowest call, not the sum.
+        # Only counts and a few pod names are needed, so let kubectl project
+        # one name per line instead of shipping full JSON objects over to be
+        # parsed and discarded here.
+        tasks = [
+            ("pods", ["kubectl", "get", "pods", "--all-namespaces",
+                      "-o", "jsonpath={range .items[*]}{.metadata.name}{\"\\n\"}{end}"]),
+            ("services", ["kubectl", "get", "services", "--all-namespaces", "-o", "name"]),
+            ("deployments", ["kubectl", "get", "deployments", "--all-namespaces", "-o", "name"])
+        ]
 
-        # Get deployments
-        success, output = self.run_command([
-            "kubectl", "get", "deployments", "--all-namespaces",
-            "-o", "json"
-        ])
-        if success:
-            try:
-                dep_data = json.loads(output)
-                dep_count = len(dep_data.get("items", []))
-                self.findings["kubernetes"]["deployments"] = dep_count
-                self.log(f"Found {dep_count} deployments")
-            except (json.JSONDecodeError, KeyError, TypeError):
-                pass
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # kubectl talks to a possibly remote API server — allow more
+            # headroom than the local-probe default
+            futures = {executor.submit(self.run_command, cmd, timeout=10): key for key, cmd in tasks}
+            for future in as_completed(futures):
+                key = futures[future]
+                success, output = future.result()
+                if not success:
+                    continue
+                names = [line for line in output.splitlines() if line]
+                self.findings["kubernetes"][key] = len(names)
+                self.log(f"Found {len(names)} {key}")
+
+                if key == "pods":
+                    # Sample some pod names
+                    self.findings["kubernetes"]["sample_pods"] = names[:5]
 
         # Suggestions for K8s
         if self.findings["kubernetes"].get("pods", 0) > 0:
@@ -146,14 +191,14 @@ class EnvironmentInspector:
             if path.exists() and path.is_dir():
                 try:
                     # Count log files
-                    log_files = list(path.glob("*.log"))
-                    if log_files:
+                    count, sample = sample_log_files(log_dir)
+                    if count:
                         self.findings["log_files"].append({
                             "directory": str(path),
-                            "count": len(log_files),
-                            "sample": [f.name for f in log_files[:3]]
+                            "count": count,
+                            "sample": sample
                         })
-                        self.log(f"Found {len(log_files)} log files in {log_dir}")
+                        self.log(f"Found {count} log files in {log_dir}")
 
                         # Add suggestion
                         self.findings["suggestions"].append({
@@ -169,6 +214,9 @@ class EnvironmentInspector:
         """Check for Docker"""
         self.log("Checking for Docker...")
 
+        if not binary_exists("docker"):
+            return
+
         success, output = self.run_command(["docker", "ps", "--format", "{{.Names}}"])
         if success:
             containers = [c for c in output.strip().split("\n") if c]
@@ -194,17 +242,38 @@ class EnvironmentInspector:
 
         self.log("Checking for systemd services...")
 
-        success, output = self.run_command(["systemctl", "list-units", "--type=service", "--state=running", "--no-pager"])
+        if not binary_exists("systemctl"):
+            return
+
+        # Ask systemctl for JSON so it skips column/color rendering and we
+        # skip fragile text parsing; fall back to the legacy table output on
+        # older systemd versions without -o json
+        success, output = self.run_command([
+            "systemctl", "list-units", "--type=service", "--state=running",
+            "--no-pager", "--plain", "--no-legend", "-o", "json"
+        ])
+        service_names = None
         if success:
+            try:
+                service_names = [item["unit"] for item in json.loads(output)]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                service_names = None
+
+        if service_names is None:
+            success, output = self.run_command(["systemctl", "list-units", "--type=service", "--state=running", "--no-pager"])
+            if not success:
+                return
             lines = output.strip().split("\n")
             # Count services (skip header/footer)
             service_lines = [l for l in lines if ".service" in l]
-            self.findings["services"] = {
-                "type": "systemd",
-                "count": len(service_lines),
-                "sample": [l.split()[0] for l in service_lines[:5] if l.strip()]
-            }
-            self.log(f"Found {len(service_lines)} running systemd services")
+            service_names = [l.split()[0] for l in service_lines if l.strip()]
+
+        self.findings["services"] = {
+            "type": "systemd",
+            "count": len(service_names),
+            "sample": service_names[:5]
+        }
+        self.log(f"Found {len(service_names)} running systemd services")
 
     def inspect_common_apps(self):
         """Check for common applications"""
@@ -218,31 +287,57 @@ class EnvironmentInspector:
             ("mongod", ["mongod", "--version"])
         ]
 
-        for app_name, cmd in apps_to_check:
-            success, output = self.run_command(cmd)
+        # Skip probes for binaries not on PATH, then run the rest
+        # concurrently and collect results in order so findings stay
+        # deterministic
+        apps_to_check = [(name, cmd) for name, cmd in apps_to_check if binary_exists(cmd[0])]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda ac: (ac[0], *self.run_command(ac[1])), apps_to_check))
+
+        for app_name, success, output in results:
             if success:
                 self.findings["applications"].append({
                     "name": app_name,
                     "status": "installed",
-                    "version": output.strip().split("\n")[0][:100]
+                    "version": output.partition("\n")[0].strip()[:100]
                 })
                 self.log(f"✓ Found {app_name}")
 
+    def _port_open(self, port: int, host: str = "localhost", timeout: float = 0.2) -> bool:
+        """Check whether a local TCP port accepts connections"""
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
     def inspect_metrics_endpoints(self):
         """Check for common metrics endpoints"""
-        # Check for Prometheus node exporter
-        success, _ = self.run_command(["curl", "-s", "http://localhost:9100/metrics", "-o", "/dev/null"])
-        if success:
+        # A TCP connect is enough to detect an exporter — no curl subprocess,
+        # no HTTP request, no body download. Probe the ports concurrently.
+        exporters = [
+            (9100, "Node Exporter"),
+            (9090, "Prometheus")
+        ]
+
+        with ThreadPoolExecutor(max_workers=len(exporters)) as executor:
+            results = list(executor.map(lambda e: (e[0], e[1], self._port_open(e[0])), exporters))
+
+        for port, name, is_open in results:
+            if not is_open:
+                continue
+            endpoint = f"http://localhost:{port}/metrics"
             self.findings["metrics_endpoints"].append({
                 "type": "prometheus",
-                "endpoint": "http://localhost:9100/metrics",
-                "description": "Node Exporter"
+                "endpoint": endpoint,
+                "description": name
             })
             self.findings["suggestions"].append({
                 "type": "input",
                 "config": "prometheus_scrape_input",
-                "endpoint": "http://localhost:9100/metrics",
-                "description": "Scrape Prometheus node exporter metrics"
+                "endpoint": endpoint,
+                "description": f"Scrape {name} metrics"
             })
 
     def inspect_all(self):
@@ -253,12 +348,8 @@ class EnvironmentInspector:
         print(f"Platform: {self.os_type}")
         print(f"{'='*80}\n")
 
-        self.inspect_kubernetes()
-        self.inspect_linux_logs()
-        self.inspect_docker()
-        self.inspect_systemd_services()
-        self.inspect_common_apps()
-        self.inspect_metrics_endpoints()
+        for inspect in self._dispatch.get(self.os_type, [self.inspect_kubernetes, self.inspect_common_apps]):
+            inspect()
 
     def generate_suggestions(self):
         """Generate pipeline configuration suggestions"""
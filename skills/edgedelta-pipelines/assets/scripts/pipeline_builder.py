@@ -26,11 +26,65 @@ Config JSON format:
 }
 """
 
+import copy
 import sys
 import json
 import yaml
 from pathlib import Path
 
+# Prefer the libyaml-backed C emitter when available — a drop-in for the
+# plain dicts/lists/scalars this builder emits, at a fraction of the cost
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
+# orjson is an optional extra that parses large spec files several times
+# faster than stdlib json; both accept the raw bytes read below
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Static fields of the input node types, merged into each node instead of
+# re-executing full dict literals per input
+_FILE_INPUT_TMPL = {"type": "file_input"}
+_OTLP_INPUT_TMPL = {"type": "otlp_input", "read_timeout": "1m0s"}
+_HTTP_PULL_INPUT_TMPL = {"type": "http_pull_input", "method": "GET"}
+
+# PII masking processor templates, built once at import. Keyed by the mask
+# type names accepted in the spec's processing.pii_masking list; callers get
+# deep copies so emitted configs stay independently mutable.
+_PII_MASK_PROCESSORS = {
+    "passwords": {
+        "type": "generic_mask",
+        "capture_group_masks": [{
+            "capture_group": "(?i)(password|passwd|pwd)[:=]\\S+",
+            "enabled": True,
+            "mask": "***PASSWORD***",
+            "name": "password"
+        }]
+    },
+    "emails": {
+        "type": "generic_mask",
+        "capture_group_masks": [{
+            "capture_group": "[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}",
+            "enabled": True,
+            "mask": "***EMAIL***",
+            "name": "email"
+        }]
+    },
+    "credit_cards": {
+        "type": "generic_mask",
+        "capture_group_masks": [{
+            "capture_group": "\\b\\d{4}[\\s-]?\\d{4}[\\s-]?\\d{4}[\\s-]?\\d{4}\\b",
+            "enabled": True,
+            "mask": "***CC***",
+            "name": "credit_card"
+        }]
+    }
+}
+
 class PipelineBuilder:
     def __init__(self):
         self.config = {
@@ -44,6 +98,10 @@ class PipelineBuilder:
             "links": [],
             "nodes": []
         }
+        # Processing-spec → sequence-node-name cache: inputs with identical
+        # processing fan into one shared sequence instead of each getting
+        # its own near-duplicate copy
+        self._seq_cache = {}
 
     def add_telemetry_input(self):
         """Add required ed_self_telemetry_input"""
@@ -69,31 +127,29 @@ class PipelineBuilder:
     def add_file_input(self, name, path):
         """Add file input node"""
         self.config["nodes"].append({
+            **_FILE_INPUT_TMPL,
             "name": name,
-            "type": "file_input",
-            "user_description": f"File logs from {path}",
+            "user_description": "File logs from " + path,
             "path": path
         })
 
     def add_otlp_input(self, name, port, protocol="grpc"):
         """Add OTLP input node"""
         self.config["nodes"].append({
+            **_OTLP_INPUT_TMPL,
             "name": name,
-            "type": "otlp_input",
-            "user_description": f"OTLP {protocol.upper()} receiver",
+            "user_description": "OTLP " + protocol.upper() + " receiver",
             "port": port,
-            "protocol": protocol,
-            "read_timeout": "1m0s"
+            "protocol": protocol
         })
 
     def add_http_pull_input(self, name, endpoint, pull_interval="5m"):
         """Add HTTP pull input node"""
         self.config["nodes"].append({
+            **_HTTP_PULL_INPUT_TMPL,
             "name": name,
-            "type": "http_pull_input",
-            "user_description": f"API pull from {endpoint}",
+            "user_description": "API pull from " + endpoint,
             "endpoint": endpoint,
-            "method": "GET",
             "pull_interval": pull_interval,
             "headers": [
                 {"header": "Accept", "value": "application/json"}
@@ -111,43 +167,12 @@ class PipelineBuilder:
         self.config["nodes"].append(node)
 
     def build_pii_masking_processors(self, mask_types):
-        """Build PII masking processors"""
-        processors = []
-
-        if "passwords" in mask_types:
-            processors.append({
-                "type": "generic_mask",
-                "capture_group_masks": [{
-                    "capture_group": "(?i)(password|passwd|pwd)[:=]\\S+",
-                    "enabled": True,
-                    "mask": "***PASSWORD***",
-                    "name": "password"
-                }]
-            })
-
-        if "emails" in mask_types:
-            processors.append({
-                "type": "generic_mask",
-                "capture_group_masks": [{
-                    "capture_group": "[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}",
-                    "enabled": True,
-                    "mask": "***EMAIL***",
-                    "name": "email"
-                }]
-            })
-
-        if "credit_cards" in mask_types:
-            processors.append({
-                "type": "generic_mask",
-                "capture_group_masks": [{
-                    "capture_group": "\\b\\d{4}[\\s-]?\\d{4}[\\s-]?\\d{4}[\\s-]?\\d{4}\\b",
-                    "enabled": True,
-                    "mask": "***CC***",
-                    "name": "credit_card"
-                }]
-            })
-
-        return processors
+        """Build PII masking processors from the module-level templates"""
+        return [
+            copy.deepcopy(template)
+            for mask_type, template in _PII_MASK_PROCESSORS.items()
+            if mask_type in mask_types
+        ]
 
     def build_from_spec(self, spec):
         """Build pipeline from specification"""
@@ -181,61 +206,82 @@ class PipelineBuilder:
                     input_spec.get("pull_interval", "5m")
                 )
 
-            # Add sequence for this input if processing is needed
+            # Route through a shared sequence if processing is needed
             processing = spec.get("processing", {})
-            if processing:
-                processors = []
-
-                # PII masking
-                if "pii_masking" in processing:
-                    processors.extend(self.build_pii_masking_processors(processing["pii_masking"]))
-
-                # Sampling
-                if "sampling" in processing:
-                    processors.append({
-                        "type": "sample",
-                        "percentage": processing["sampling"]
-                    })
-
-                # Metric extraction
-                if processing.get("extract_metrics"):
-                    processors.append({
-                        "type": "extract_metric",
-                        "extract_metric_rules": [{
-                            "name": "log_events_total",
-                            "description": "Total log events",
-                            "unit": "1",
-                            "conditions": ['IsMatch(body, ".*")'],
-                            "sum": {
-                                "aggregation_temporality": "delta",
-                                "is_monotonic": True,
-                                "value": 1
-                            }
-                        }],
-                        "interval": "1m"
-                    })
-
-                # Mark last processor as final
-                if processors:
-                    processors[-1]["final"] = True
-
-                    # Add sequence
-                    seq_name = f"{input_name}_processing"
-                    self.add_sequence(seq_name, processors)
-
-                    # Add links
-                    self.config["links"].append({"from": input_name, "to": seq_name})
-                    self.config["links"].append({"from": seq_name, "to": "edgedelta"})
-                else:
-                    # Direct link to output
-                    self.config["links"].append({"from": input_name, "to": "edgedelta"})
+            seq_name = self._get_or_build_sequence(processing) if processing else None
+            if seq_name:
+                self.config["links"].append({"from": input_name, "to": seq_name})
             else:
                 # Direct link to output
                 self.config["links"].append({"from": input_name, "to": "edgedelta"})
 
+    def _get_or_build_sequence(self, processing):
+        """Return the sequence node name for a processing spec, building it on first use
+
+        Identical processing specs (the common case — one policy for all
+        inputs) collapse to a single sequence node with one link to the
+        output; each input just adds its own fan-in link.
+        """
+        proc_key = json.dumps(processing, sort_keys=True)
+        if proc_key in self._seq_cache:
+            return self._seq_cache[proc_key]
+
+        processors = []
+
+        # PII masking
+        if "pii_masking" in processing:
+            processors.extend(self.build_pii_masking_processors(processing["pii_masking"]))
+
+        # Sampling
+        if "sampling" in processing:
+            processors.append({
+                "type": "sample",
+                "percentage": processing["sampling"]
+            })
+
+        # Metric extraction
+        if processing.get("extract_metrics"):
+            processors.append({
+                "type": "extract_metric",
+                "extract_metric_rules": [{
+                    "name": "log_events_total",
+                    "description": "Total log events",
+                    "unit": "1",
+                    "conditions": ['IsMatch(body, ".*")'],
+                    "sum": {
+                        "aggregation_temporality": "delta",
+                        "is_monotonic": True,
+                        "value": 1
+                    }
+                }],
+                "interval": "1m"
+            })
+
+        if not processors:
+            self._seq_cache[proc_key] = None
+            return None
+
+        # Mark last processor as final
+        processors[-1]["final"] = True
+
+        seq_name = "shared_processing" if not self._seq_cache else f"shared_processing_{len(self._seq_cache) + 1}"
+        self.add_sequence(seq_name, processors)
+        self.config["links"].append({"from": seq_name, "to": "edgedelta"})
+        self._seq_cache[proc_key] = seq_name
+        return seq_name
+
     def to_yaml(self):
         """Convert to YAML string"""
-        return yaml.dump(self.config, default_flow_style=False, sort_keys=False)
+        return yaml.dump(self.config, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
+
+    def to_json(self):
+        """Convert to JSON string
+
+        Pipeline v3 configs are plain JSON-compatible data and YAML is a
+        superset of JSON, so consumers that re-parse the output can skip
+        YAML emission and parsing entirely by asking for JSON.
+        """
+        return json.dumps(self.config, indent=2, ensure_ascii=False)
 
 def main():
     if len(sys.argv) < 2:
@@ -251,16 +297,19 @@ def main():
         output_path = sys.argv[output_idx] if output_idx else "pipeline.yaml"
 
         # Load config
-        with open(config_path, 'r') as f:
-            spec = json.load(f)
+        with open(config_path, 'rb') as f:
+            spec = _json_loads(f.read())
 
         # Build pipeline
         builder = PipelineBuilder()
         builder.build_from_spec(spec)
 
-        # Write output
+        # Write output — JSON when the target extension asks for it
         with open(output_path, 'w') as f:
-            f.write(builder.to_yaml())
+            if output_path.endswith(".json"):
+                f.write(builder.to_json())
+            else:
+                f.write(builder.to_yaml())
 
         print(f"✓ Pipeline written to {output_path}")
 
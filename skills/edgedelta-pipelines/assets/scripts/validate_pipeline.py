@@ -5,18 +5,30 @@ Validates pipeline v3 YAML configurations against EdgeDelta rules
 
 Usage:
     python3 validate_pipeline.py <pipeline.yaml>
-    python3 validate_pipeline.py <pipeline.yaml> --verbose
+    python3 validate_pipeline.py <pipeline.yaml> --verbose [--stream]
+    python3 validate_pipeline.py --batch "pipelines/*.yaml" [--jobs N]
 
 Based on EdgeDelta validation rules from:
     edgedelta-main/configv3/config_validation.go
 """
 
+import glob
 import sys
 import yaml
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Dict, List, Tuple
 from pathlib import Path
 
+# Prefer the libyaml-backed C loader when available (7-20x faster parse);
+# install PyYAML with libyaml support to get it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # Add parent directory to path for instrumentation import
 sys.path.insert(0, str(Path(__file__).parents[3] / "_shared"))
 try:
@@ -35,7 +47,9 @@ except ImportError:
 # Sequence-compatible processors (from sequence_node.go:52-76)
 # NOTE: Also includes nested 'sequence', 'comment', 'aggregate_metric', 'ottl_filter'
 # which are valid in production pipelines
-SEQUENCE_COMPATIBLE_PROCESSORS = {
+# Members are interned so membership tests against interned processor types
+# hit CPython's pointer-identity fast path; frozenset since it never changes
+SEQUENCE_COMPATIBLE_PROCESSORS = frozenset(map(sys.intern, (
     "generic_mask", "extract_metric", "ottl_transform", "sample", "dedup",
     "log_to_pattern_metric", "delete_empty_values", "json_unroll",
     "log_to_metric", "log_to_signal", "metric_to_log", "trace_to_log",
@@ -49,44 +63,257 @@ SEQUENCE_COMPATIBLE_PROCESSORS = {
     "ottl_filter",       # OTTL filtering is valid
     "lookup",            # Lookup enrichment processor
     "route",             # Routing processor for conditional flows
-}
+)))
 
 # Required node that must be present
 REQUIRED_NODES = {"ed_self_telemetry_input"}
 
+# Pipelines at or above this size are loaded through the event-stream path
+# below, which materializes only the fields the validators actually read
+_STREAM_THRESHOLD_BYTES = 100 * 1024
+
+# Node fields worth keeping on the streaming path; everything else in a node
+# is irrelevant to validation and is skipped event by event
+_NODE_KEYS_KEPT = frozenset({"name", "type", "processors"})
+
+_RESOLVER = yaml.resolver.Resolver()
+_CONSTRUCTOR = yaml.constructor.SafeConstructor()
+
+class _StreamFallback(Exception):
+    """Raised when the reduced loader meets YAML it can't compose faithfully.
+
+    Anchors, aliases, and merge keys need real node composition; the
+    caller falls back to the full loader so validation results never
+    depend on which path parsed the file.
+    """
+
+def _scalar_value(event):
+    """Turn a ScalarEvent into a typed Python value (str/int/bool/None/...)"""
+    implicit = event.implicit if event.implicit else (True, False)
+    tag = event.tag or _RESOLVER.resolve(yaml.ScalarNode, event.value, implicit)
+    try:
+        return _CONSTRUCTOR.construct_object(yaml.ScalarNode(tag, event.value, style=event.style))
+    except yaml.constructor.ConstructorError as e:
+        # e.g. a '<<' merge key resolving to the merge tag
+        raise _StreamFallback(str(e)) from e
+
+def _compose_from(event, events):
+    """Build a Python value starting from an already-consumed event"""
+    if isinstance(event, yaml.AliasEvent) or getattr(event, "anchor", None):
+        raise _StreamFallback("anchors/aliases need the full loader")
+    if isinstance(event, yaml.ScalarEvent):
+        return _scalar_value(event)
+    if isinstance(event, yaml.SequenceStartEvent):
+        seq = []
+        while True:
+            item = next(events)
+            if isinstance(item, yaml.SequenceEndEvent):
+                return seq
+            seq.append(_compose_from(item, events))
+    if isinstance(event, yaml.MappingStartEvent):
+        mapping = {}
+        while True:
+            key_event = next(events)
+            if isinstance(key_event, yaml.MappingEndEvent):
+                return mapping
+            key = _compose_from(key_event, events)
+            mapping[key] = _compose_from(next(events), events)
+    # Anything unexpected contributes nothing the validators use
+    return None
+
+def _skip_value(events):
+    """Consume one value's worth of events without materializing it"""
+    event = next(events)
+    if not isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+        return
+    depth = 1
+    while depth:
+        event = next(events)
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+
+def _compose_nodes_reduced(events):
+    """Materialize the nodes list keeping only validation-relevant fields"""
+    event = next(events)
+    if not isinstance(event, yaml.SequenceStartEvent):
+        # Malformed nodes value — materialize it and let the validators complain
+        return _compose_from(event, events)
+    nodes = []
+    while True:
+        item = next(events)
+        if isinstance(item, yaml.SequenceEndEvent):
+            return nodes
+        if not isinstance(item, yaml.MappingStartEvent):
+            nodes.append(_compose_from(item, events))
+            continue
+        if item.anchor:
+            raise _StreamFallback("anchored node needs the full loader")
+        node = {}
+        while True:
+            key_event = next(events)
+            if isinstance(key_event, yaml.MappingEndEvent):
+                break
+            key = _compose_from(key_event, events)
+            if key in _NODE_KEYS_KEPT:
+                node[key] = _compose_from(next(events), events)
+            else:
+                _skip_value(events)
+        nodes.append(node)
+
+def _stream_load_reduced(raw: bytes):
+    """Load a pipeline document from events, skipping node config bodies.
+
+    Peak memory for the full-load path is dominated by the node
+    configuration dicts, which the validators never look at beyond
+    name/type/processors. Walking libyaml's event stream and dropping those
+    values keeps validation of multi-MB pipelines lean.
+    """
+    events = yaml.parse(raw, Loader=_YamlLoader)
+
+    try:
+        for event in events:
+            if isinstance(event, yaml.MappingStartEvent):
+                if event.anchor:
+                    raise _StreamFallback("anchored document needs the full loader")
+                break
+            if isinstance(event, yaml.StreamEndEvent):
+                return None
+        else:
+            return None
+
+        config = {}
+        while True:
+            key_event = next(events)
+            if isinstance(key_event, yaml.MappingEndEvent):
+                break
+            key = _compose_from(key_event, events)
+            if key == "nodes":
+                config[key] = _compose_nodes_reduced(events)
+            else:
+                config[key] = _compose_from(next(events), events)
+
+        # Drain the stream: a second document must fail here exactly the
+        # way the full loader fails it, not validate the first doc alone
+        for event in events:
+            if isinstance(event, yaml.DocumentStartEvent):
+                raise _StreamFallback("multi-document stream needs the full loader")
+        return config
+    finally:
+        # construct_object memoizes every scalar it builds and only
+        # construct_document (never called here) clears the memo — drop it
+        # so repeated loads in one process don't accumulate
+        _CONSTRUCTOR.constructed_objects.clear()
+
+# All content-based formatting checks fused into one pattern so a single
+# pass over the file finds every issue; add new checks as new groups
+_FORMAT_ISSUES_RE = re.compile(
+    r'(?P<unicode>[→✓✗])'
+    r'|(?P<persist>persisting_cursor_settings)'
+    r'|(?P<json_path>json_field_path:\s*["\']\.)'
+)
+
 class PipelineValidator:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, stream=False):
         self.errors = []
         self.warnings = []
         self.verbose = verbose
-
-    def log(self, msg):
+        # Node lookups shared across validators, filled in once per validate()
+        self._nodes_by_name = {}
+        self._node_types = set()
+        # Output is buffered and written once at the end of validate() — one
+        # write(2) instead of one per line, which dominates wall-clock time
+        # on verbose runs against big pipelines. --stream restores per-line
+        # output for users who want to watch validation in real time.
+        self._out_lines = []
+        if stream:
+            self._emit = print
+        # With verbose off, debug calls should cost nothing — not even the
+        # message formatting, which is why hot-loop callers pass %-style args
+        if not verbose:
+            self.log = self._log_noop
+
+    def _emit(self, line=""):
+        self._out_lines.append(line)
+
+    def _flush_output(self):
+        if self._out_lines:
+            sys.stdout.write("\n".join(self._out_lines) + "\n")
+            self._out_lines.clear()
+
+    def log(self, msg, *args):
         if self.verbose:
-            print(f"[DEBUG] {msg}")
+            self._emit(f"[DEBUG] {msg % args if args else msg}")
+
+    def _log_noop(self, msg, *args):
+        pass
 
     def error(self, msg):
         self.errors.append(msg)
-        print(f"✗ ERROR: {msg}")
+        self._emit(f"✗ ERROR: {msg}")
 
     def warning(self, msg):
         self.warnings.append(msg)
-        print(f"⚠ WARNING: {msg}")
+        self._emit(f"⚠ WARNING: {msg}")
 
     def validate(self, config_path: str) -> bool:
         """Main validation entry point"""
-        print(f"\n{'='*80}")
-        print(f"Validating: {config_path}")
-        print(f"{'='*80}\n")
+        emit = self._emit
+        emit(f"\n{'='*80}")
+        emit(f"Validating: {config_path}")
+        emit(f"{'='*80}\n")
 
         with measure_time("Total validation"):
             try:
                 with measure_time("YAML parsing"):
-                    with open(config_path, 'r') as f:
-                        config = yaml.safe_load(f)
+                    # Read once; the same buffer feeds the YAML parser and
+                    # the formatting scan below. Large pipelines go through
+                    # the reduced event-stream loader to keep peak memory
+                    # proportional to what the validators actually inspect.
+                    with open(config_path, 'rb') as f:
+                        raw = f.read()
+                    config = None
+                    if len(raw) >= _STREAM_THRESHOLD_BYTES:
+                        try:
+                            config = _stream_load_reduced(raw)
+                        except _StreamFallback:
+                            # Anchors/aliases/merge keys — well-formed YAML
+                            # the reduced path doesn't compose; full load
+                            config = None
+                        except yaml.YAMLError:
+                            raise
+                        except Exception:
+                            # Bugs in the reduced loader must not fail a
+                            # valid pipeline — fall back to a full load
+                            config = None
+                    if config is None:
+                        config = yaml.load(raw, Loader=_YamlLoader)
             except Exception as e:
                 self.error(f"Failed to parse YAML: {e}")
+                self._flush_output()
                 return False
 
+            # Build node lookups once; each validator below reuses them
+            # instead of re-scanning the node list. The name index also
+            # gives O(1) access to node attributes for link-level checks.
+            nodes = config.get("nodes", []) if isinstance(config, dict) else []
+
+            # The parser hands back a fresh str per scalar, so repeated
+            # types like "generic_mask" arrive as distinct objects. Intern
+            # them once here so the compatibility-set membership tests in
+            # validate_sequences resolve on pointer identity.
+            intern = sys.intern
+            for n in nodes:
+                if isinstance(n, dict) and isinstance(n.get("type"), str):
+                    n["type"] = intern(n["type"])
+                    for proc in n.get("processors") or ():
+                        if isinstance(proc, dict) and isinstance(proc.get("type"), str):
+                            proc["type"] = intern(proc["type"])
+
+            self._nodes_by_name = {n["name"]: n for n in nodes if isinstance(n, dict) and "name" in n}
+            self._node_types = {n["type"] for n in nodes if isinstance(n, dict) and "type" in n}
+
             # Run all validations
             with measure_time("Version validation"):
                 self.validate_version(config)
@@ -107,30 +334,31 @@ class PipelineValidator:
                 self.validate_required_nodes(config)
 
             with measure_time("YAML formatting check"):
-                self.validate_yaml_formatting(config_path)
+                self.validate_yaml_formatting(raw.decode('utf-8', 'replace'))
 
         # Print summary
-        print(f"\n{'='*80}")
-        print("VALIDATION SUMMARY")
-        print(f"{'='*80}")
-        print(f"Errors: {len(self.errors)}")
-        print(f"Warnings: {len(self.warnings)}")
+        emit(f"\n{'='*80}")
+        emit("VALIDATION SUMMARY")
+        emit(f"{'='*80}")
+        emit(f"Errors: {len(self.errors)}")
+        emit(f"Warnings: {len(self.warnings)}")
 
         if len(self.errors) == 0 and len(self.warnings) == 0:
-            print("\n✓✓✓ VALIDATION PASSED - Pipeline is valid! ✓✓✓\n")
-            if INSTRUMENTATION_AVAILABLE:
-                print_summary()
-            return True
+            emit("\n✓✓✓ VALIDATION PASSED - Pipeline is valid! ✓✓✓\n")
+            success = True
         elif len(self.errors) == 0:
-            print(f"\n✓ VALIDATION PASSED with {len(self.warnings)} warnings\n")
-            if INSTRUMENTATION_AVAILABLE:
-                print_summary()
-            return True
+            emit(f"\n✓ VALIDATION PASSED with {len(self.warnings)} warnings\n")
+            success = True
         else:
-            print(f"\n✗ VALIDATION FAILED with {len(self.errors)} errors\n")
-            if INSTRUMENTATION_AVAILABLE:
-                print_summary()
-            return False
+            emit(f"\n✗ VALIDATION FAILED with {len(self.errors)} errors\n")
+            success = False
+
+        # Flush before print_summary() so instrumentation output lands after
+        # the report it measured
+        self._flush_output()
+        if INSTRUMENTATION_AVAILABLE:
+            print_summary()
+        return success
 
     def validate_version(self, config: Dict):
         """Validate pipeline version"""
@@ -189,19 +417,22 @@ class PipelineValidator:
                 self.error(f"Duplicate node name: '{name}'")
             node_names.add(name)
 
-            self.log(f"Node '{name}' (type: {node_type}) ✓")
+            self.log("Node '%s' (type: %s) ✓", name, node_type)
 
         return node_names
 
     def validate_links(self, config: Dict):
         """Validate links reference existing nodes"""
-        nodes = config.get("nodes", [])
         links = config.get("links", [])
-
-        node_names = {node["name"] for node in nodes if "name" in node}
+        node_names = self._nodes_by_name
 
         self.log(f"Found {len(links)} links")
 
+        # Build the adjacency list and in-degrees in the same pass that
+        # checks link endpoints; the graph checks below reuse them
+        adjacency = {}
+        indegree = dict.fromkeys(node_names, 0)
+
         for idx, link in enumerate(links):
             if not isinstance(link, dict):
                 self.error(f"Link {idx} is not a dictionary")
@@ -221,13 +452,52 @@ class PipelineValidator:
                 self.error(f"Link references non-existent 'from' node: '{from_node}'")
             if to_node not in node_names:
                 self.error(f"Link references non-existent 'to' node: '{to_node}'")
-
-            self.log(f"Link: {from_node} → {to_node} ✓")
+            elif from_node in node_names:
+                # Only edges between existing nodes enter the graph; a
+                # dangling 'from' must not leave its target with a phantom
+                # in-degree that the cycle sweep can never drain
+                adjacency.setdefault(from_node, []).append(to_node)
+                indegree[to_node] += 1
+
+            self.log("Link: %s → %s ✓", from_node, to_node)
+
+        # Graph checks: one Kahn's-algorithm sweep over the adjacency list
+        # catches cycles, and the initial in-degree-0 set flags nodes that
+        # nothing feeds even though they aren't inputs
+        sources = [name for name, degree in indegree.items() if degree == 0]
+
+        for name in sources:
+            # 'or' rather than a .get default: an explicit null type is
+            # stored as None and validate_nodes already reports it
+            node_type = node_names[name].get("type") or ""
+            if not node_type.endswith("_input"):
+                self.warning(f"Node '{name}' has no incoming links but is not an input node")
+
+        queue = deque(sources)
+        visited = 0
+        while queue:
+            name = queue.popleft()
+            visited += 1
+            for downstream in adjacency.get(name, ()):
+                indegree[downstream] -= 1
+                if indegree[downstream] == 0:
+                    queue.append(downstream)
+
+        if visited != len(indegree):
+            cyclic = sorted(name for name, degree in indegree.items() if degree > 0)
+            self.error(f"Pipeline graph contains a cycle involving: {', '.join(cyclic)}")
 
     def validate_sequences(self, config: Dict):
         """Validate sequence processors"""
         nodes = config.get("nodes", [])
 
+        # Hoist lookups out of the per-processor loop — on pipelines with
+        # many sequences these add up to real bytecode savings
+        compatible = SEQUENCE_COMPATIBLE_PROCESSORS
+        err = self.error
+        warn = self.warning
+        log = self.log
+
         for node in nodes:
             if node.get("type") != "sequence":
                 continue
@@ -236,56 +506,51 @@ class PipelineValidator:
             processors = node.get("processors", [])
 
             if not processors:
-                self.warning(f"Sequence '{name}' has no processors")
+                warn(f"Sequence '{name}' has no processors")
                 continue
 
-            self.log(f"Validating sequence '{name}' with {len(processors)} processors")
+            log("Validating sequence '%s' with %d processors", name, len(processors))
 
-            # Validate each processor
+            # One pass over the processors checks type compatibility, final
+            # placement, and DeOTEL ordering together
+            last_idx = len(processors) - 1
             final_count = 0
-            deotel_position = None
 
             for idx, processor in enumerate(processors):
                 if not isinstance(processor, dict):
-                    self.error(f"Sequence '{name}' processor {idx} is not a dictionary")
+                    err(f"Sequence '{name}' processor {idx} is not a dictionary")
                     continue
 
                 proc_type = processor.get("type")
                 if not proc_type:
-                    self.error(f"Sequence '{name}' processor {idx} missing 'type'")
+                    err(f"Sequence '{name}' processor {idx} missing 'type'")
                     continue
 
                 # Check if processor is sequence-compatible
-                if proc_type not in SEQUENCE_COMPATIBLE_PROCESSORS:
-                    self.error(f"Sequence '{name}' contains non-sequence-compatible processor: '{proc_type}'")
+                if proc_type not in compatible:
+                    err(f"Sequence '{name}' contains non-sequence-compatible processor: '{proc_type}'")
 
                 # Check for final flag
                 if processor.get("final"):
                     final_count += 1
-                    if idx != len(processors) - 1:
-                        self.error(f"Sequence '{name}' has 'final: true' on processor {idx}, but it's not the last processor")
-
-                # Track DeOTEL position
-                if proc_type == "deotel":
-                    deotel_position = idx
+                    if idx != last_idx:
+                        err(f"Sequence '{name}' has 'final: true' on processor {idx}, but it's not the last processor")
 
-                self.log(f"  Processor {idx}: {proc_type} ✓")
+                # DeOTEL must be the last processor
+                if proc_type == "deotel" and idx != last_idx:
+                    err(f"Sequence '{name}' has DeOTEL processor at position {idx}, but it must be last")
 
-            # Validate DeOTEL is last if present
-            if deotel_position is not None:
-                if deotel_position != len(processors) - 1:
-                    self.error(f"Sequence '{name}' has DeOTEL processor at position {deotel_position}, but it must be last")
+                log("  Processor %d: %s ✓", idx, proc_type)
 
             # Warn if no final flag
             if final_count == 0:
-                self.warning(f"Sequence '{name}' has no processor with 'final: true'")
+                warn(f"Sequence '{name}' has no processor with 'final: true'")
             elif final_count > 1:
-                self.error(f"Sequence '{name}' has multiple processors with 'final: true'")
+                err(f"Sequence '{name}' has multiple processors with 'final: true'")
 
     def validate_required_nodes(self, config: Dict):
         """Validate required nodes are present"""
-        nodes = config.get("nodes", [])
-        node_types = {node.get("type") for node in nodes if "type" in node}
+        node_types = self._node_types
 
         for required_type in REQUIRED_NODES:
             if required_type not in node_types:
@@ -293,37 +558,76 @@ class PipelineValidator:
             else:
                 self.log(f"Required node '{required_type}' present ✓")
 
-    def validate_yaml_formatting(self, config_path: str):
-        """Check for common YAML formatting issues"""
+    def validate_yaml_formatting(self, content: str):
+        """Check for common YAML formatting issues in the raw file content"""
         try:
-            with open(config_path, 'r') as f:
-                content = f.read()
-
-            # Check for Unicode characters in comments
-            if '→' in content or '✓' in content or '✗' in content:
+            # One scan over the content covers every formatting check
+            found = set()
+            for match in _FORMAT_ISSUES_RE.finditer(content):
+                found.add(match.lastgroup)
+                if len(found) == _FORMAT_ISSUES_RE.groups:
+                    break
+
+            # Unicode characters in comments
+            if "unicode" in found:
                 self.warning("YAML contains Unicode characters (→, ✓, ✗) which may cause API errors")
 
-            # Check for json_field_path starting with dot
-            if re.search(r'json_field_path:\s*["\']\.', content):
+            # json_field_path starting with dot
+            if "json_path" in found:
                 self.error("json_field_path cannot start with '.' - use '$' instead")
 
-            # Check for persisting_cursor_settings (known to cause issues)
-            if 'persisting_cursor_settings' in content:
+            # persisting_cursor_settings (known to cause issues)
+            if "persist" in found:
                 self.warning("persisting_cursor_settings may cause API 500 errors - consider removing")
 
         except Exception as e:
             self.warning(f"Could not validate YAML formatting: {e}")
 
+def validate_one(config_path: str, verbose: bool = False, stream: bool = False):
+    """Validate a single pipeline file; returns (path, ok, errors, warnings)"""
+    validator = PipelineValidator(verbose=verbose, stream=stream)
+    ok = validator.validate(config_path)
+    return config_path, ok, validator.errors, validator.warnings
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python3 validate_pipeline.py <pipeline.yaml> [--verbose]")
+        print("Usage: python3 validate_pipeline.py <pipeline.yaml> [--verbose] [--stream]")
+        print("       python3 validate_pipeline.py --batch <glob> [--jobs N] [--verbose]")
         sys.exit(1)
 
-    config_path = sys.argv[1]
-    verbose = "--verbose" in sys.argv or "-v" in sys.argv
+    args = sys.argv[1:]
+    verbose = "--verbose" in args or "-v" in args
+    stream = "--stream" in args
+
+    if "--batch" in args:
+        # Validation is CPU-bound on YAML parsing and embarrassingly
+        # parallel across files — fan out over a process pool
+        pattern = args[args.index("--batch") + 1]
+        jobs = int(args[args.index("--jobs") + 1]) if "--jobs" in args else None
+
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            print(f"✗ No files match pattern: {pattern}")
+            sys.exit(1)
+
+        # Buffered output (the default) also keeps each worker's report
+        # contiguous instead of interleaved across processes
+        failed = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for path, ok, errors, warnings in executor.map(validate_one, paths, repeat(verbose)):
+                if not ok:
+                    failed.append(path)
+
+        print(f"\n{'='*80}")
+        print("BATCH SUMMARY")
+        print(f"{'='*80}")
+        print(f"Valid:   {len(paths) - len(failed)}/{len(paths)}")
+        for path in failed:
+            print(f"✗ {path}")
+
+        sys.exit(1 if failed else 0)
 
-    validator = PipelineValidator(verbose=verbose)
-    success = validator.validate(config_path)
+    _, success, _, _ = validate_one(args[0], verbose, stream)
 
     sys.exit(0 if success else 1)
 